@@ -1,10 +1,27 @@
 import sqlite3
-import json
 from contextlib import contextmanager
 from typing import List, Optional
 from pydantic import BaseModel
-import datetime
 import os
+import threading
+
+# --- JSON (de)serialization ---
+# Prefer orjson (C implementation) for tag lists; fall back to the stdlib.
+try:
+    import orjson
+
+    _dumpb = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumpb(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    _loads = json.loads
+
+def _dumps(obj) -> str:
+    return _dumpb(obj).decode('utf-8')
 
 # --- Pydantic Schema ---
 class Campaign(BaseModel):
@@ -13,82 +30,171 @@ class Campaign(BaseModel):
     name: str
     person_tags: List[str]
     company_tags: List[str]
-    created_at: str
+    created_at: int # Milliseconds since the Unix epoch
 
 # --- Database Configuration & Initialization ---
 DATA_DIR = "data"
 DB_FILE = os.path.join(DATA_DIR, "campaigns.db")
 
-@contextmanager
-def get_db_connection():
-    """Provides a managed database connection, ensuring it's closed after use."""
+# --- SQL Statements ---
+# Kept as constants so the exact same text is reused on every call, which lets
+# sqlite3's per-connection statement cache skip re-preparing them.
+_SQL_SELECT_ALL = "SELECT id, name, person_tags, company_tags, created_at FROM campaigns ORDER BY created_at DESC"
+_SQL_SELECT_ONE = "SELECT id, name, person_tags, company_tags, created_at FROM campaigns WHERE id = ?"
+_SQL_UPSERT = """
+    INSERT INTO campaigns (id, name, person_tags, company_tags, created_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        name=excluded.name,
+        person_tags=excluded.person_tags,
+        company_tags=excluded.company_tags
+"""
+_SQL_DELETE = "DELETE FROM campaigns WHERE id = ?"
 
-    # Ensure the data directory exists before connecting
-    os.makedirs(DATA_DIR, exist_ok=True) 
+# A single long-lived connection keeps SQLite's page cache warm across requests.
+# SQLite allows one writer at a time, so writes are serialized with a lock;
+# reads under WAL do not block and need no lock.
+_CONN: Optional[sqlite3.Connection] = None
+_CONN_LOCK = threading.Lock()
+_WRITE_LOCK = threading.Lock()
 
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row
-    try:
+def _get_conn() -> sqlite3.Connection:
+    """Returns the shared connection, opening and configuring it on first use."""
+    global _CONN
+    if _CONN is None:
+        with _CONN_LOCK:
+            if _CONN is None:
+                # Ensure the data directory exists before connecting
+                os.makedirs(DATA_DIR, exist_ok=True)
+
+                # check_same_thread=False: sync endpoints run on FastAPI's threadpool
+                conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None, cached_statements=128)
+                conn.row_factory = sqlite3.Row
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute("PRAGMA temp_store=MEMORY")
+                conn.execute("PRAGMA cache_size=-64000") # ~64 MB
+                _CONN = conn
+    return _CONN
+
+@contextmanager
+def get_db_connection(write: bool = False):
+    """Provides the shared database connection, holding the write lock for write paths."""
+    conn = _get_conn()
+    if not write:
+        yield conn
+        return
+    with _WRITE_LOCK:
         yield conn
-    finally:
-        conn.close()
+
+# Tags are JSON arrays stored as TEXT; the CHECKs let SQLite's JSON1
+# functions (e.g. json_each) operate on them directly.
+_SQL_CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        person_tags TEXT NOT NULL DEFAULT '[]' CHECK (json_valid(person_tags)),
+        company_tags TEXT NOT NULL DEFAULT '[]' CHECK (json_valid(company_tags)),
+        created_at INTEGER NOT NULL
+    )
+"""
 
 def init_db():
     """Initializes the database and creates tables if they don't exist."""
-    with get_db_connection() as conn:
+    with get_db_connection(write=True) as conn:
         cursor = conn.cursor()
         # Create the 'campaigns' table to store campaign details
+        cursor.execute(_SQL_CREATE_TABLE.format(table="campaigns"))
+        _migrate_created_at(cursor)
+        # Index serving the "ORDER BY created_at DESC" list query without a sort
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_campaigns_created_at ON campaigns(created_at DESC)")
+
+def _migrate_created_at(cursor: sqlite3.Cursor):
+    """
+    Rebuilds a legacy 'campaigns' table whose created_at column holds ISO
+    timestamps as TEXT, converting them to integer epoch milliseconds.
+    """
+    columns = {row["name"]: row["type"] for row in cursor.execute("PRAGMA table_info(campaigns)")}
+    if columns.get("created_at") != "TEXT":
+        return
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute(_SQL_CREATE_TABLE.format(table="campaigns_new"))
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS campaigns (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                person_tags TEXT,
-                company_tags TEXT,
-                created_at TEXT NOT NULL
-            )
+            INSERT INTO campaigns_new (id, name, person_tags, company_tags, created_at)
+            SELECT id, name, COALESCE(person_tags, '[]'), COALESCE(company_tags, '[]'),
+                   CAST(ROUND((julianday(created_at) - 2440587.5) * 86400000) AS INTEGER)
+            FROM campaigns
         """)
-        conn.commit()
+        cursor.execute("DROP TABLE campaigns")
+        cursor.execute("ALTER TABLE campaigns_new RENAME TO campaigns")
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
 
 # --- Campaign CRUD Functions ---
-def get_all_campaigns() -> List[Campaign]:
-    """Retrieves all campaigns from the database, ordered by creation date."""
+def get_all_campaigns_raw() -> List[dict]:
+    """
+    Retrieves all campaigns as plain dicts, ordered by creation date.
+    Tags are left as the stored JSON (UTF-8 bytes) without being decoded.
+    """
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, person_tags, company_tags, created_at FROM campaigns ORDER BY created_at DESC")
-        campaigns = [
-            Campaign(
-                id=row["id"],
-                name=row["name"],
-                person_tags=json.loads(row["person_tags"]),
-                company_tags=json.loads(row["company_tags"]),
-                created_at=row["created_at"]
-            ) for row in cursor.fetchall()
-        ]
-        return campaigns
+        rows = conn.execute(_SQL_SELECT_ALL).fetchall()
+    return [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "person_tags": row["person_tags"].encode('utf-8'),
+            "company_tags": row["company_tags"].encode('utf-8'),
+            "created_at": row["created_at"],
+        } for row in rows
+    ]
+
+def get_all_campaigns_json() -> bytes:
+    """
+    Returns all campaigns serialized as a JSON array. The stored tag JSON is
+    spliced in as-is, so tags are never decoded and re-encoded.
+    """
+    fragments = [
+        b'{"id":' + _dumpb(c["id"])
+        + b',"name":' + _dumpb(c["name"])
+        + b',"person_tags":' + c["person_tags"]
+        + b',"company_tags":' + c["company_tags"]
+        + b',"created_at":' + _dumpb(c["created_at"])
+        + b'}'
+        for c in get_all_campaigns_raw()
+    ]
+    return b'[' + b','.join(fragments) + b']'
+
+def get_campaign(campaign_id: str) -> Optional[Campaign]:
+    """Retrieves a single campaign by its ID, or None if it does not exist."""
+    with get_db_connection() as conn:
+        row = conn.execute(_SQL_SELECT_ONE, (campaign_id,)).fetchone()
+    if not row:
+        return None
+    return Campaign(
+        id=row["id"],
+        name=row["name"],
+        person_tags=_loads(row["person_tags"]),
+        company_tags=_loads(row["company_tags"]),
+        created_at=row["created_at"]
+    )
 
 def upsert_campaign(campaign: Campaign):
     """Creates a new campaign or updates an existing one based on its ID."""
-    with get_db_connection() as conn:
+    with get_db_connection(write=True) as conn:
         cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO campaigns (id, name, person_tags, company_tags, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(id) DO UPDATE SET
-                name=excluded.name,
-                person_tags=excluded.person_tags,
-                company_tags=excluded.company_tags
-        """, (
+        cursor.execute(_SQL_UPSERT, (
             campaign.id,
             campaign.name,
-            json.dumps(campaign.person_tags),  # Store lists as JSON strings
-            json.dumps(campaign.company_tags),
+            _dumps(campaign.person_tags),  # Store lists as JSON strings
+            _dumps(campaign.company_tags),
             campaign.created_at
         ))
-        conn.commit()
 
 def remove_campaign(campaign_id: str):
     """Deletes a campaign from the database by its ID."""
-    with get_db_connection() as conn:
+    with get_db_connection(write=True) as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
-        conn.commit()
+        cursor.execute(_SQL_DELETE, (campaign_id,))
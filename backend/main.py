@@ -1,16 +1,23 @@
-import xmlrpc.client as xmlrpc
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, HttpUrl
+from fastapi import FastAPI, HTTPException, Response
+from pydantic import BaseModel, Field, HttpUrl
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
 import base64
 import logging
-from typing import Optional, List
+from typing import Optional, List, Union
 from starlette.middleware.cors import CORSMiddleware
-import uuid
-import datetime
+import uuid6
 from dotenv import load_dotenv
 import os
+import hashlib
+import functools
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, AsyncExitStack
 from . import db # Import the local database module
+from .odoo import OdooAsync, OdooError, close_http_client
 
 # --- Configuration and Setup ---
 
@@ -21,41 +28,48 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 try:
     load_dotenv()
-    # Read the comma-separated list of origins
-    chrome_origins_str = os.environ.get("CHROME_EXTENSION_ORIGIN", "")
 except Exception as e:
     logger.error(f"Failed to load environment variables: {e}")
 
+# Define allowed origins for CORS (Cross-Origin Resource Sharing):
+# LinkedIn for the content script, plus the comma-separated extension
+# origins from the .env variable. Parsed once at import. Not enforced
+# yet: the middleware below still allows all origins.
+chrome_origins = frozenset(
+    o.strip() for o in os.environ.get("CHROME_EXTENSION_ORIGIN", "").split(',') if o.strip()
+)
+allowed_origins = frozenset({"https://www.linkedin.com", *chrome_origins})
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Releases the pooled Odoo HTTP connections on shutdown."""
+    yield
+    await close_http_client()
+
 # Initialize FastAPI application
 app = FastAPI(
     title="LinkedIn to Odoo Backend",
-    description="API to handle contact creation and campaign management."
+    description="API to handle contact creation and campaign management.",
+    lifespan=lifespan
 )
 
 # Initialize the SQLite database on application startup
 db.init_db()
 
-'''
-# Define allowed origins for CORS (Cross-Origin Resource Sharing)
-allowed_origins = [
-    "https://www.linkedin.com", # LinkedIn for the content script
-]
-
-# Add multiple extension origins from the .env variable
-if chrome_origins_str:
-    # Split the string by commas and add each one to the list
-    for origin in chrome_origins_str.split(','):
-        stripped_origin = origin.strip()
-        if stripped_origin:
-            allowed_origins.append(stripped_origin)
-    logger.info(f"Configured allowed origins: {allowed_origins}")
-else:
-    logger.warning("CHROME_EXTENSION_ORIGIN environment variable is not set. Chrome extension requests may be blocked by CORS policy.")
-'''
+class SetCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware that matches origins with a set lookup instead of a list scan."""
+    def __init__(self, app, allow_origins=(), **kwargs):
+        super().__init__(app, allow_origins=allow_origins, **kwargs)
+        self._allowed_set = frozenset(allow_origins)
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        if self.allow_all_origins:
+            return True
+        return origin in self._allowed_set
 
 # Configure CORS middleware    
 app.add_middleware(
-    CORSMiddleware,
+    SetCORSMiddleware,
     # allow_origins=allowed_origins,
     allow_origins=["*"],
     allow_credentials=True,
@@ -64,18 +78,54 @@ app.add_middleware(
 )
 
 # --- Odoo Client Helper Function ---
-def get_odoo_client(url: str, database: str, username: str, api_token: str = ""):
+# Authenticated clients are cached per credential set so that every request
+# does not pay an extra 'authenticate' round-trip to Odoo.
+ODOO_CLIENT_TTL = 300 # seconds
+_ODOO_CLIENTS: dict = {} # key -> (client, uid, timestamp)
+_ODOO_CLIENTS_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=64)
+def _odoo_for_url(url: str) -> OdooAsync:
+    """Returns the (memoized) client for a server URL, normalized with a trailing slash."""
+    return OdooAsync(url.rstrip('/') + '/')
+
+def _odoo_client_key(url: str, database: str, username: str, api_token: str) -> tuple:
+    """Builds the cache key for a credential set without keeping the raw token."""
+    return (url, database, username, hashlib.sha256(api_token.encode()).hexdigest())
+
+def invalidate_odoo_client(url: str, database: str, username: str, api_token: str = ""):
+    """Evicts a cached Odoo client, forcing re-authentication on next use."""
+    endpoint = _odoo_for_url(str(url)).endpoint
+    with _ODOO_CLIENTS_LOCK:
+        _ODOO_CLIENTS.pop(_odoo_client_key(endpoint, database, username, api_token), None)
+
+def is_auth_fault(e: Exception) -> bool:
+    """Returns True if the exception is an Odoo error caused by rejected credentials."""
+    return isinstance(e, OdooError) and 'AccessDenied' in e.name
+
+async def get_odoo_client(url: str, database: str, username: str, api_token: str = ""):
     """
-    Attempts to authenticate with the Odoo XML-RPC API.
-    Returns the models proxy, user ID (uid), and a status message.
+    Attempts to authenticate with the Odoo JSON-RPC API.
+    Returns the client, user ID (uid), and a status message.
+    Successful logins are cached for ODOO_CLIENT_TTL seconds.
     """
+    client = _odoo_for_url(str(url))
+    key = _odoo_client_key(client.endpoint, database, username, api_token)
+    with _ODOO_CLIENTS_LOCK:
+        cached = _ODOO_CLIENTS.get(key)
+    if cached and time.monotonic() - cached[2] < ODOO_CLIENT_TTL:
+        return cached[0], cached[1], "Connected successfully"
+
     try:
-        url = str(url).rstrip('/') + '/'
-        common = xmlrpc.ServerProxy(f"{url}xmlrpc/2/common")
-        uid = common.authenticate(database, username, api_token, {})
+        uid = await client.authenticate(database, username, api_token)
         if uid:
-            models = xmlrpc.ServerProxy(f"{url}xmlrpc/2/object")
-            return models, uid, "Connected successfully"
+            now = time.monotonic()
+            with _ODOO_CLIENTS_LOCK:
+                # Drop expired entries so the cache does not grow without bound
+                for k in [k for k, (_, _, ts) in _ODOO_CLIENTS.items() if now - ts >= ODOO_CLIENT_TTL]:
+                    del _ODOO_CLIENTS[k]
+                _ODOO_CLIENTS[key] = (client, uid, now)
+            return client, uid, "Connected successfully"
         return None, None, "Authentication failed"
     except Exception as e:
         logger.error(f"Odoo Connection Error: {e}")
@@ -94,8 +144,8 @@ class ContactCheckPayload(OdooCredentials):
     name: Optional[str] = None
     email: Optional[str] = None
     
-class ContactPayload(OdooCredentials):
-    """Schema for creating/updating a contact, extending credentials."""
+class ContactFields(BaseModel):
+    """Schema for the person and company fields of a single contact."""
     name: str
     company: Optional[str] = None
     job_position: Optional[str] = None
@@ -112,6 +162,16 @@ class ContactPayload(OdooCredentials):
     company_tags: Optional[str] = None # Comma-separated string
     company_additional_info: Optional[str] = None
 
+class ContactPayload(OdooCredentials, ContactFields):
+    """Schema for creating/updating a contact, extending credentials."""
+
+MAX_BATCH_CONTACTS = 100
+
+class ContactBatchPayload(OdooCredentials):
+    """Schema for creating/updating several contacts at once, extending credentials."""
+    # Bounded, since every contact's images are held in memory until the batch is sent
+    contacts: List[ContactFields] = Field(max_length=MAX_BATCH_CONTACTS)
+
 class CampaignCreate(BaseModel):
     """Schema for creating or updating a campaign."""
     name: str
@@ -119,62 +179,206 @@ class CampaignCreate(BaseModel):
     company_tags: List[str]
 
 # --- Utility Functions ---
+# Shared HTTP session so image downloads reuse pooled keep-alive connections
+_HTTP = requests.Session()
+_HTTP.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32))
+# Add a user-agent to mimic a browser, as LinkedIn may block default request agents
+_HTTP.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+IMAGE_DOWNLOAD_TIMEOUT = 10 # seconds
+MAX_IMAGE_BYTES = 5 * 1024 * 1024 # 5 MB
+
 def download_image_as_base64(url: Optional[str]) -> Optional[str]:
     """Downloads an image from a URL and returns it as a base64 encoded string."""
     if not url: return None
     try:
-        # Add a user-agent to mimic a browser, as LinkedIn may block default request agents
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        r = requests.get(url, timeout=10, headers=headers)
-        r.raise_for_status()
-        return base64.b64encode(r.content).decode('utf-8')
-    except requests.exceptions.RequestException as e:
+        # Stream the body so an oversized response is never fully buffered
+        with _HTTP.get(url, timeout=IMAGE_DOWNLOAD_TIMEOUT, stream=True) as r:
+            r.raise_for_status()
+            # Skip the download entirely if the server announces an oversized body
+            if int(r.headers.get('Content-Length') or 0) > MAX_IMAGE_BYTES:
+                logger.warning(f"Skipping image from {url}: larger than {MAX_IMAGE_BYTES} bytes")
+                return None
+            chunks = []
+            total = 0
+            for chunk in r.iter_content(chunk_size=65536):
+                total += len(chunk)
+                if total > MAX_IMAGE_BYTES:
+                    logger.warning(f"Skipping image from {url}: larger than {MAX_IMAGE_BYTES} bytes")
+                    return None
+                chunks.append(chunk)
+        # Encode once over the joined bytes rather than per chunk
+        return base64.b64encode(b''.join(chunks)).decode('ascii')
+    except (requests.exceptions.RequestException, ValueError) as e:
         logger.warning(f"Failed to download image from {url}: {e}")
         return None
 
-def find_or_create_tags_odoo(odoo, uid, db_name, api_token, tag_names_str: Optional[str]) -> List[int]:
+# Locks serializing find-then-create per record name, so concurrent requests
+# cannot both miss the search and create the same tag or company twice.
+# Entries disappear once no request holds them.
+_CREATE_LOCKS = weakref.WeakValueDictionary() # (server, db, model, casefolded name) -> asyncio.Lock
+
+@asynccontextmanager
+async def _creation_lock(server: str, database: str, model: str, names: List[str]):
+    """Holds the creation locks for all given record names (in a fixed order)."""
+    locks = []
+    for key in sorted({(server, database, model, n.casefold()) for n in names}):
+        lock = _CREATE_LOCKS.get(key)
+        if lock is None:
+            lock = _CREATE_LOCKS[key] = asyncio.Lock()
+        locks.append(lock)
+    async with AsyncExitStack() as stack:
+        for lock in locks:
+            await stack.enter_async_context(lock)
+        yield
+
+async def _search_companies(odoo, uid, db_name, api_token, names: List[str], limit: Optional[int] = None) -> List[dict]:
+    """Searches companies by name (case-insensitive), returning COMPANY_FIELDS."""
+    name_parts = [['name', '=ilike', n] for n in names]
+    domain = [['is_company', '=', True]] + ['|'] * (len(name_parts) - 1) + name_parts
+    kwargs = {'fields': COMPANY_FIELDS}
+    if limit:
+        kwargs['limit'] = limit
+    return await odoo.execute_kw(
+        db_name, uid, api_token, 
+        'res.partner', 'search_read', 
+        [domain], # Domain list in args list
+        kwargs # Use kwargs dict for fields/limit
+    )
+
+def _normalize_tags(tags: Union[str, List[str], None]) -> List[str]:
+    """
+    Cleans up tags: splits comma-separated strings, strips, and removes
+    case-insensitive duplicates, keeping the first-seen spelling and order.
+    """
+    if not tags: return []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    unique = {}
+    for t in tags:
+        if t := t.strip():
+            unique.setdefault(t.casefold(), t)
+    return list(unique.values())
+
+async def find_or_create_tags_odoo(odoo, uid, db_name, api_token, tags: Union[str, List[str], None]) -> List[int]:
     """
     Finds existing Odoo partner tags ('res.partner.category') or creates new ones.
+    'tags' is a comma-separated string or a list of tag names.
+    Tags are matched case-insensitively, so an existing "B2B" is reused for "b2b".
+    Resolves all tags with one 'search_read' plus one multi-record 'create'.
     Returns a list of tag IDs.
     """
-    if not tag_names_str: return []
-    tag_ids = []
-    # Ensure tags are unique
-    tag_names = list(set([t.strip() for t in tag_names_str.split(',') if t.strip()]))
-    
+    tag_names = _normalize_tags(tags)
     if not tag_names: return []
 
-    for tag_name in tag_names:
-        try:
-            # Search for the tag by name
-            domain = [['name', '=', tag_name]]
-            ids = odoo.execute_kw(
+    try:
+        async with _creation_lock(odoo.endpoint, db_name, 'res.partner.category', tag_names):
+            # Search for all tags by name (case-insensitive) at once
+            name_parts = [['name', '=ilike', n] for n in tag_names]
+            domain = ['|'] * (len(name_parts) - 1) + name_parts
+            found = await odoo.execute_kw(
                 db_name, uid, api_token, 
-                'res.partner.category', 'search', 
+                'res.partner.category', 'search_read', 
                 [domain], # Domain list in args list
-                {'limit': 1} # Kwargs dictionary
+                {'fields': ['id', 'name']} # Kwargs dictionary
             )
-            
-            if ids:
-                tag_ids.append(ids[0])
-            else:
-                # Create the tag if it doesn't exist
-                new_id = odoo.execute_kw(db_name, uid, api_token, 'res.partner.category', 'create', [{'name': tag_name}])
-                tag_ids.append(new_id)
-        except Exception as e:
-            logger.error(f"Error finding/creating tag '{tag_name}': {e}")
-            # If it's a Fault, raise it to be caught by the main endpoint handler
-            if isinstance(e, xmlrpc.Fault):
-                raise e 
-            # Otherwise, just log and continue (maybe a transient issue)
-    return tag_ids
+            # Match on the casefolded name ('=ilike' also treats '%' and '_' as wildcards)
+            name_to_id = {}
+            for r in found:
+                name_to_id.setdefault(r['name'].casefold(), r['id'])
+
+            # Create the missing tags in a single call, with the caller's spelling
+            missing = [n for n in tag_names if n.casefold() not in name_to_id]
+            if missing:
+                new_ids = await odoo.execute_kw(db_name, uid, api_token, 'res.partner.category', 'create', [[{'name': n} for n in missing]])
+                name_to_id.update(zip((n.casefold() for n in missing), new_ids))
+    except Exception as e:
+        logger.error(f"Error finding/creating tags {tag_names}: {e}")
+        # If it's an Odoo error, raise it to be caught by the main endpoint handler
+        if isinstance(e, OdooError):
+            raise e 
+        # Otherwise, just log and continue (maybe a transient issue)
+        return []
+    return [name_to_id[n.casefold()] for n in tag_names]
+
+# Companies seen recently, so that importing many people from the same
+# company does not search (and rewrite) it every time.
+COMPANY_CACHE_TTL = 60 # seconds
+COMPANY_FIELDS = ['id', 'name', 'website', 'comment', 'image_1920', 'category_id']
+_COMPANY_CACHE: dict = {} # (server, db, casefolded name) -> (company row, timestamp)
+
+def _company_is_unchanged(row: dict, values: dict) -> bool:
+    """Returns True if writing 'values' would not change the company 'row'."""
+    for field, value in values.items():
+        if field == 'is_company':
+            continue # Rows come from an 'is_company' search
+        if field == 'category_id':
+            # (6, 0, [IDs]) command vs. the list of IDs read back
+            if set(value[0][2]) != set(row.get('category_id') or []):
+                return False
+        elif row.get(field) != value:
+            return False
+    return True
+
+def _cache_company(key: tuple, row: dict, values: dict):
+    """Stores the company row as it is after 'values' were written to it."""
+    now = time.monotonic()
+    # Drop expired entries so the cache does not grow without bound
+    for k in [k for k, (_, ts) in _COMPANY_CACHE.items() if now - ts >= COMPANY_CACHE_TTL]:
+        del _COMPANY_CACHE[k]
+    row = {**row, **values}
+    if 'category_id' in values:
+        row['category_id'] = list(values['category_id'][0][2])
+    _COMPANY_CACHE[key] = (row, now)
+
+def _company_data(contact: ContactFields, img: Optional[str], tag_ids: List[int]) -> dict:
+    """Builds the company values that are common to both create and update."""
+    data = {
+        'name': contact.company.strip(), 
+        'is_company': True,
+    }
+    if contact.company_linkedin_url is not None:
+        data['website'] = str(contact.company_linkedin_url)
+    if contact.company_additional_info is not None:
+        data['comment'] = contact.company_additional_info
+    if img: 
+        data['image_1920'] = img
+    if tag_ids: 
+        data['category_id'] = [(6, 0, tag_ids)] # (6, 0, [IDs]) replaces tags
+    return data
+
+def _person_data(contact: ContactFields, img: Optional[str], tag_ids: List[int]) -> dict:
+    """Builds the person values, adding optional fields only if they are not None."""
+    data = {
+        'name': contact.name.strip(), 
+        'is_company': False,
+    }
+    if contact.job_position is not None:
+        data['function'] = contact.job_position
+    if contact.email is not None:
+        data['email'] = contact.email
+    if contact.phone is not None:
+        data['phone'] = contact.phone
+    if contact.website is not None:
+        data['website'] = str(contact.website)
+    
+    # Here, city IS added to the person's data.
+    if contact.city is not None:
+        data['city'] = contact.city
+        
+    if contact.additional_info is not None:
+        data['comment'] = contact.additional_info
+    if img: 
+        data['image_1920'] = img
+    if tag_ids: 
+        data['category_id'] = [(6, 0, tag_ids)]
+    return data
 
 # --- FastAPI Endpoints ---
 
 @app.post("/test_connection")
 async def test_odoo_connection(credentials: OdooCredentials):
     """Endpoint to validate Odoo connection credentials."""
-    _, uid, message = get_odoo_client(str(credentials.odoo_server), credentials.odoo_db_name, credentials.username, credentials.api_token)
+    _, uid, message = await get_odoo_client(str(credentials.odoo_server), credentials.odoo_db_name, credentials.username, credentials.api_token)
     if uid:
         return {"status": "success", "message": message, "uid": uid}
     raise HTTPException(status_code=401, detail=message)
@@ -182,7 +386,7 @@ async def test_odoo_connection(credentials: OdooCredentials):
 @app.post("/check_contact")
 async def check_contact_exists(payload: ContactCheckPayload):
     """Checks if an individual contact exists in Odoo by name or email."""
-    models, uid, msg = get_odoo_client(str(payload.odoo_server), payload.odoo_db_name, payload.username, payload.api_token)
+    models, uid, msg = await get_odoo_client(str(payload.odoo_server), payload.odoo_db_name, payload.username, payload.api_token)
     if not uid:
         raise HTTPException(status_code=401, detail=msg)
     
@@ -207,7 +411,7 @@ async def check_contact_exists(payload: ContactCheckPayload):
         final_domain = ['&', domain_parts[0], c_domain]
 
     try:
-        existing_ids = models.execute_kw(
+        existing_ids = await models.execute_kw(
             payload.odoo_db_name, uid, payload.api_token, 
             'res.partner', 'search', 
             [final_domain],  # Domain must be wrapped in a list for the 'args' param
@@ -219,8 +423,11 @@ async def check_contact_exists(payload: ContactCheckPayload):
         return {"exists": False, "id": None}
     except Exception as e:
         logger.error(f"Error checking contact: {e}")
-        if isinstance(e, xmlrpc.Fault):
-            raise HTTPException(status_code=500, detail=f"Odoo Error: {e.faultString}")
+        if is_auth_fault(e):
+            # Drop the cached session so the next attempt re-authenticates
+            invalidate_odoo_client(str(payload.odoo_server), payload.odoo_db_name, payload.username, payload.api_token)
+        if isinstance(e, OdooError):
+            raise HTTPException(status_code=500, detail=f"Odoo Error: {e.message}")
         raise HTTPException(status_code=500, detail=f"Error checking contact: {e}")
 
 
@@ -229,56 +436,39 @@ async def create_contact_endpoint(payload: ContactPayload):
     """
     Creates or updates a contact (and its parent company) in Odoo.
     It finds/creates the company first, then finds/creates the individual contact.
+    When both are new, they are created together in a single call.
     """
-    models, uid, msg = get_odoo_client(str(payload.odoo_server), payload.odoo_db_name, payload.username, payload.api_token)
+    models, uid, msg = await get_odoo_client(str(payload.odoo_server), payload.odoo_db_name, payload.username, payload.api_token)
     if not uid: raise HTTPException(status_code=401, detail=msg)
     
     odoo, db_name, api_token = models, payload.odoo_db_name, payload.api_token
     company_id = None
+
+    # Start the image downloads right away in worker threads; run_in_executor
+    # submits immediately, so they overlap each other and the Odoo calls below.
+    # The company photo is only needed when there is a company.
+    loop = asyncio.get_running_loop()
+    company_photo_future = None
+    if payload.company:
+        company_photo_future = loop.run_in_executor(None, download_image_as_base64, payload.company_photo)
+    photo_future = loop.run_in_executor(None, download_image_as_base64, payload.photo)
     
     try:
-        # 1. Find or Create Company
+        # 1. Search for Company and Person. The two lookups are independent,
+        # so they are started together and run concurrently.
+        company_search = None
+        company_rows = []
         if payload.company:
-            name = payload.company.strip()
-            # Search for company by name (case-insensitive)
-            domain = [['is_company', '=', True], ['name', '=ilike', name]]
-            ids = odoo.execute_kw(
-                db_name, uid, api_token, 
-                'res.partner', 'search', 
-                [domain], # Domain list in args list
-                {'limit': 1} # Use kwargs dict for limit
-            )
-            
-            # Prepare data that is common to both create and update
-            common_data = {
-                'name': name, 
-                'is_company': True,
-            }
-            if payload.company_linkedin_url is not None:
-                common_data['website'] = str(payload.company_linkedin_url)
-            if payload.company_additional_info is not None:
-                common_data['comment'] = payload.company_additional_info
-            if img := download_image_as_base64(payload.company_photo): 
-                common_data['image_1920'] = img
-            if tags := find_or_create_tags_odoo(odoo, uid, db_name, api_token, payload.company_tags): 
-                common_data['category_id'] = [(6, 0, tags)] # (6, 0, [IDs]) replaces tags
-                
-            if ids:
-                company_id = ids[0]
-                # Company exists. ONLY write common_data.
-                # We do not write 'city' here, as this propagates to 
-                # child contacts and erases their location.
-                odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'write', [[company_id], common_data])
+            company_name = payload.company.strip()
+            company_key = (str(payload.odoo_server), db_name, company_name.casefold())
+            cached = _COMPANY_CACHE.get(company_key)
+            if cached and time.monotonic() - cached[1] < COMPANY_CACHE_TTL:
+                # Recently seen company: skip the search
+                company_rows = [cached[0]]
             else:
-                # Company is new. Add 'city': False to the create payload
-                # to ensure it's created without a location.
-                create_data = common_data.copy()
-                create_data['city'] = False 
-                
-                # Create new company
-                company_id = odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'create', [create_data])
-
-        # 2. Find or Create Person
+                # Search for company by name (case-insensitive)
+                company_search = asyncio.create_task(_search_companies(odoo, uid, db_name, api_token, [company_name], limit=1))
+
         name = payload.name.strip()
         
         domain_parts = []
@@ -287,6 +477,7 @@ async def create_contact_endpoint(payload: ContactPayload):
         if payload.email:
             domain_parts.append(['email', '=', payload.email])
         
+        person_search = None
         ids = [] # Default to no IDs found
         final_domain = [] # Default to empty domain
         
@@ -300,81 +491,247 @@ async def create_contact_endpoint(payload: ContactPayload):
                 final_domain = ['&', domain_parts[0], c_domain]
             
             # Search for existing person
-            ids = odoo.execute_kw(
+            person_search = asyncio.create_task(odoo.execute_kw(
                 db_name, uid, api_token, 
                 'res.partner', 'search', 
                 [final_domain], # Domain list in args list
                 {'limit': 1} # Use kwargs dict for limit
-            )
+            ))
 
-        # Prepare person data
-        data = {
-            'name': name, 
-            'is_company': False,
-        }
-        
-        # Conditionally add fields only if they are not None
-        if payload.job_position is not None:
-            data['function'] = payload.job_position
-        if payload.email is not None:
-            data['email'] = payload.email
-        if payload.phone is not None:
-            data['phone'] = payload.phone
-        if payload.website is not None:
-            data['website'] = str(payload.website)
-        
-        # Here, payload.city IS added to the person's 'data' dict.
-        if payload.city is not None:
-            data['city'] = payload.city
-            
-        if payload.additional_info is not None:
-            data['comment'] = payload.additional_info
-        
-        # Set 'parent-id' in a separate 'write' call (see below)
-        # to avoid Odoo's onchange logic overwriting the city.
-        
-        if img := download_image_as_base64(payload.photo): data['image_1920'] = img
-        if tags := find_or_create_tags_odoo(odoo, uid, db_name, api_token, payload.tags): 
-            data['category_id'] = [(6, 0, tags)]
+        searches = [t for t in (company_search, person_search) if t]
+        await asyncio.gather(*searches)
+        if company_search:
+            company_rows = company_search.result()
+        if person_search:
+            ids = person_search.result()
+
+        # 2. Prepare company data that is common to both create and update
+        if payload.company:
+            company_tag_ids = await find_or_create_tags_odoo(odoo, uid, db_name, api_token, payload.company_tags)
+            common_data = _company_data(payload, await company_photo_future, company_tag_ids)
+
+        # 3. Prepare person data
+        tag_ids = await find_or_create_tags_odoo(odoo, uid, db_name, api_token, payload.tags)
+        data = _person_data(payload, await photo_future, tag_ids)
+
+        # 4a. New company: re-check under the creation lock so concurrent
+        # requests for the same company create it only once.
+        if payload.company and not company_rows:
+            async with _creation_lock(odoo.endpoint, db_name, 'res.partner', [company_name]):
+                company_rows = await _search_companies(odoo, uid, db_name, api_token, [company_name], limit=1)
+                if not company_rows:
+                    # Company is new. Add 'city': False to the create payload
+                    # to ensure it's created without a location.
+                    create_data = common_data.copy()
+                    create_data['city'] = False 
+
+                    if not ids:
+                        # Fast path: new company and new person are created in a
+                        # single call, with the person nested as a child of the company.
+                        create_data['child_ids'] = [(0, 0, data)] # (0, 0, values) creates a linked record
+                        company_id = await odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'create', [create_data])
+                        company = await odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'read', [[company_id], ['child_ids']])
+                        person_id = company[0]['child_ids'][0]
+                        _cache_company(company_key, {'id': company_id}, common_data)
+                        return {"status": "success", "person_id": person_id, "company_id": company_id}
+
+                    # Create new company
+                    company_id = await odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'create', [create_data])
+                    _cache_company(company_key, {'id': company_id}, common_data)
+
+        # 4b. Existing Company
+        if payload.company and company_rows:
+            company_id = company_rows[0]['id']
+            # Company exists. ONLY write common_data, and only if it
+            # would change something.
+            # We do not write 'city' here, as this propagates to 
+            # child contacts and erases their location.
+            if not _company_is_unchanged(company_rows[0], common_data):
+                await odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'write', [[company_id], common_data])
+            _cache_company(company_key, company_rows[0], common_data)
+
+        # 4c. Find or Create Person
+        # Link the parent company in the same call
+        if company_id:
+            data['parent_id'] = company_id
 
         if ids:
             person_id = ids[0]
-            # Update existing person (Step 1: update details)
-            odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'write', [[person_id], data])
-            # (Step 2: update parent)
-            if company_id:
-                odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'write', [[person_id], {'parent_id': company_id}])
+            # Update existing person
+            await odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'write', [[person_id], data])
         else:
-            # Create new person (Step 1: create with details)
-            person_id = odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'create', [data])
-            # (Step 2: update parent)
-            if company_id:
-                odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'write', [[person_id], {'parent_id': company_id}])
+            # Create new person
+            person_id = await odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'create', [data])
         
         return {"status": "success", "person_id": person_id, "company_id": company_id}
 
     except Exception as e:
         logger.error(f"Error in create_contact_endpoint: {e}")
-        # Check if e is an XML-RPC Fault and extract the Odoo-side error
-        if isinstance(e, xmlrpc.Fault):
-            raise HTTPException(status_code=500, detail=f"Odoo Error: {e.faultString}")
+        if is_auth_fault(e):
+            # Drop the cached session so the next attempt re-authenticates
+            invalidate_odoo_client(str(payload.odoo_server), db_name, payload.username, api_token)
+        # Check if e is an Odoo JSON-RPC error and extract the Odoo-side error
+        if isinstance(e, OdooError):
+            raise HTTPException(status_code=500, detail=f"Odoo Error: {e.message}")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
 
 
+@app.post("/create_contacts")
+async def create_contacts_endpoint(payload: ContactBatchPayload):
+    """
+    Creates or updates several contacts (and their parent companies) in Odoo.
+    Tags, companies and persons are each resolved with one search and one
+    multi-record create for the whole batch, instead of several calls per contact.
+    """
+    models, uid, msg = await get_odoo_client(str(payload.odoo_server), payload.odoo_db_name, payload.username, payload.api_token)
+    if not uid: raise HTTPException(status_code=401, detail=msg)
+
+    odoo, db_name, api_token = models, payload.odoo_db_name, payload.api_token
+    contacts = payload.contacts
+    if not contacts:
+        return {"status": "success", "results": []}
+
+    # Group contacts by company (the first contact of each company provides its data)
+    companies = {} # casefolded name -> index of first contact
+    for i, c in enumerate(contacts):
+        if c.company and c.company.strip():
+            companies.setdefault(c.company.strip().casefold(), i)
+
+    # Start all image downloads right away in worker threads,
+    # fetching each company's photo only once
+    loop = asyncio.get_running_loop()
+    company_photo_futures = {key: loop.run_in_executor(None, download_image_as_base64, contacts[i].company_photo) for key, i in companies.items()}
+    photo_futures = [loop.run_in_executor(None, download_image_as_base64, c.photo) for c in contacts]
+
+    try:
+        # 1. Resolve the tags of all contacts and companies at once
+        all_tags = _normalize_tags([t for c in contacts for t in _normalize_tags(c.tags) + _normalize_tags(c.company_tags)])
+        tag_ids = await find_or_create_tags_odoo(odoo, uid, db_name, api_token, all_tags)
+        tag_map = dict(zip((t.casefold() for t in all_tags), tag_ids)) # casefolded name -> tag ID
+
+        def resolve_tags(tags: Optional[str]) -> List[int]:
+            return [tag_map[t.casefold()] for t in _normalize_tags(tags) if t.casefold() in tag_map]
+
+        # 2. Find or Create Companies
+        company_map = {} # casefolded name -> company ID
+        if companies:
+            company_data = {
+                key: _company_data(contacts[i], await company_photo_futures[key], resolve_tags(contacts[i].company_tags))
+                for key, i in companies.items()
+            }
+
+            # Search for all companies by name (case-insensitive)
+            def index_rows(rows: List[dict]) -> dict:
+                return {row['name'].casefold(): row for row in reversed(rows)} # first match wins
+            found = index_rows(await _search_companies(odoo, uid, db_name, api_token, [d['name'] for d in company_data.values()]))
+
+            missing = [key for key in companies if key not in found]
+            if missing:
+                # Re-check under the creation locks so concurrent requests
+                # create each company only once.
+                missing_names = [company_data[key]['name'] for key in missing]
+                async with _creation_lock(odoo.endpoint, db_name, 'res.partner', missing_names):
+                    found.update(index_rows(await _search_companies(odoo, uid, db_name, api_token, missing_names)))
+                    # Companies still missing are new; create them without a location
+                    new_companies = [(key, {**company_data[key], 'city': False}) for key in missing if key not in found]
+                    if new_companies:
+                        new_ids = await odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'create', [[d for _, d in new_companies]])
+                        for (key, create_data), company_id in zip(new_companies, new_ids):
+                            company_map[key] = company_id
+                            _cache_company((str(payload.odoo_server), db_name, key), {'id': company_id}, create_data)
+
+            writes = [] # Tasks, so they start right away
+            for key, row in found.items():
+                if key not in companies:
+                    continue
+                # Company exists. ONLY write its data, and only if it
+                # would change something (never 'city', see /create_contact).
+                common_data = company_data[key]
+                company_map[key] = row['id']
+                if not _company_is_unchanged(row, common_data):
+                    writes.append(asyncio.create_task(odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'write', [[row['id']], common_data])))
+                _cache_company((str(payload.odoo_server), db_name, key), row, common_data)
+            await asyncio.gather(*writes)
+
+        # 3. Find or Create Persons
+        names = [c.name.strip() for c in contacts]
+        emails = [c.email for c in contacts if c.email]
+        domain = [['is_company', '=', False], '|', ['name', 'in', names], ['email', 'in', emails]]
+        rows = await odoo.execute_kw(
+            db_name, uid, api_token, 
+            'res.partner', 'search_read', 
+            [domain], 
+            {'fields': ['id', 'name', 'email']}
+        )
+        by_name, by_email = {}, {}
+        for row in rows:
+            by_name.setdefault(row['name'], row['id'])
+            if row['email']:
+                by_email.setdefault(row['email'], row['id'])
+
+        person_ids = [None] * len(contacts)
+        company_ids = [None] * len(contacts)
+        writes, creates = [], [] # 'writes' holds tasks, so they start right away
+        pending = {} # name -> index in 'creates', so duplicates in the batch create one person
+        pending_for = [] # (contact index, index in 'creates')
+        for i, c in enumerate(contacts):
+            name = c.name.strip()
+            data = _person_data(c, await photo_futures[i], resolve_tags(c.tags))
+            if c.company and c.company.strip():
+                company_ids[i] = company_map.get(c.company.strip().casefold())
+            if company_ids[i]:
+                data['parent_id'] = company_ids[i]
+
+            person_id = by_name.get(name) or (by_email.get(c.email) if c.email else None)
+            if person_id:
+                # Update existing person
+                person_ids[i] = person_id
+                writes.append(asyncio.create_task(odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'write', [[person_id], data])))
+            elif name in pending:
+                # Same person twice in the batch: the last occurrence wins
+                creates[pending[name]] = data
+                pending_for.append((i, pending[name]))
+            else:
+                pending[name] = len(creates)
+                pending_for.append((i, len(creates)))
+                creates.append(data)
+
+        if creates:
+            # Create all new persons in a single call
+            new_ids = await odoo.execute_kw(db_name, uid, api_token, 'res.partner', 'create', [creates])
+            for i, idx in pending_for:
+                person_ids[i] = new_ids[idx]
+        await asyncio.gather(*writes)
+
+        return {
+            "status": "success",
+            "results": [{"person_id": p, "company_id": c} for p, c in zip(person_ids, company_ids)],
+        }
+
+    except Exception as e:
+        logger.error(f"Error in create_contacts_endpoint: {e}")
+        if is_auth_fault(e):
+            # Drop the cached session so the next attempt re-authenticates
+            invalidate_odoo_client(str(payload.odoo_server), db_name, payload.username, api_token)
+        # Check if e is an Odoo JSON-RPC error and extract the Odoo-side error
+        if isinstance(e, OdooError):
+            raise HTTPException(status_code=500, detail=f"Odoo Error: {e.message}")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {e}")
+
 # --- Campaign Endpoints (using SQLite) ---
 @app.post("/campaigns", response_model=db.Campaign)
 def create_campaign_endpoint(campaign_data: CampaignCreate):
     """Creates a new campaign in the local SQLite database."""
-    # Ensure tags are unique
-    person_tags = list(set(campaign_data.person_tags))
-    company_tags = list(set(campaign_data.company_tags))
+    # Ensure tags are unique (case-insensitively)
+    person_tags = _normalize_tags(campaign_data.person_tags)
+    company_tags = _normalize_tags(campaign_data.company_tags)
 
     new_campaign = db.Campaign(
-        id=str(uuid.uuid4()),
+        id=str(uuid6.uuid7()), # Time-ordered ID
         name=campaign_data.name,
         person_tags=person_tags,
         company_tags=company_tags,
-        created_at=datetime.datetime.utcnow().isoformat()
+        created_at=int(time.time() * 1000) # Epoch milliseconds
     )
     db.upsert_campaign(new_campaign)
     return new_campaign
@@ -382,19 +739,19 @@ def create_campaign_endpoint(campaign_data: CampaignCreate):
 @app.get("/campaigns", response_model=List[db.Campaign])
 def read_campaigns_endpoint():
     """Retrieves all campaigns from the local SQLite database."""
-    return db.get_all_campaigns()
+    # Serialized directly from the stored JSON, bypassing per-model encoding
+    return Response(content=db.get_all_campaigns_json(), media_type="application/json")
 
 @app.put("/campaigns/{campaign_id}", response_model=db.Campaign)
 def update_campaign_endpoint(campaign_id: str, campaign_data: CampaignCreate):
     """Updates an existing campaign in the local SQLite database by its ID."""
-    all_campaigns = db.get_all_campaigns()
-    existing_campaign = next((c for c in all_campaigns if c.id == campaign_id), None)
+    existing_campaign = db.get_campaign(campaign_id)
     if not existing_campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
 
-    # Ensure tags are unique
-    person_tags = list(set(campaign_data.person_tags))
-    company_tags = list(set(campaign_data.company_tags))
+    # Ensure tags are unique (case-insensitively)
+    person_tags = _normalize_tags(campaign_data.person_tags)
+    company_tags = _normalize_tags(campaign_data.company_tags)
 
     updated_campaign = db.Campaign(
         id=campaign_id,
@@ -0,0 +1,66 @@
+import itertools
+from typing import Any, Optional
+import httpx
+
+# --- Shared HTTP Client ---
+# One pooled HTTP/2 client for all Odoo servers, so concurrent requests
+# share keep-alive connections instead of blocking on a synchronous proxy.
+_http_client: Optional[httpx.AsyncClient] = None
+_request_ids = itertools.count(1)
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the shared async HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32),
+            timeout=httpx.Timeout(30.0),
+        )
+    return _http_client
+
+async def close_http_client():
+    """Closes the shared HTTP client (called on application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+# --- Odoo JSON-RPC Client ---
+class OdooError(Exception):
+    """Raised when Odoo answers a JSON-RPC call with an error."""
+    def __init__(self, message: str, name: str = ""):
+        super().__init__(message)
+        self.message = message
+        self.name = name # e.g. "odoo.exceptions.AccessDenied"
+
+class OdooAsync:
+    """Minimal async client for Odoo's external JSON-RPC API ('/jsonrpc')."""
+
+    def __init__(self, url: str):
+        # 'url' is expected to be normalized with a trailing slash
+        self.endpoint = f"{url}jsonrpc"
+
+    async def call(self, service: str, method: str, *args) -> Any:
+        """Calls a method of an Odoo service and returns its result."""
+        body = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"service": service, "method": method, "args": list(args)},
+            "id": next(_request_ids),
+        }
+        r = await get_http_client().post(self.endpoint, json=body)
+        r.raise_for_status()
+        reply = r.json()
+        if error := reply.get("error"):
+            data = error.get("data") or {}
+            raise OdooError(data.get("message") or error.get("message", "Unknown Odoo error"), data.get("name", ""))
+        return reply.get("result")
+
+    async def authenticate(self, database: str, username: str, api_token: str) -> Any:
+        """Returns the user ID for the credentials, or False if they are rejected."""
+        return await self.call("common", "authenticate", database, username, api_token, {})
+
+    async def execute_kw(self, database: str, uid: int, api_token: str, model: str, method: str, args: list, kw: Optional[dict] = None) -> Any:
+        """Same signature as the XML-RPC 'execute_kw' of the 'object' service."""
+        return await self.call("object", "execute_kw", database, uid, api_token, model, method, args, kw or {})